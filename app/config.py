@@ -10,11 +10,18 @@ class Settings(BaseSettings):
     # API Configuration
     EXTERNAL_API_URL: str = "http://127.0.0.1:8000/api/v1/analyze-video"
     EXTERNAL_API_TIMEOUT: int = 300  # seconds
+    EXTERNAL_API_RETRIES: int = 3  # Retries on connection failures and HTTP 502/503/504
+    MAX_CONCURRENT_UPLOADS: int = 8  # Videos sent to the API at once, across all requests
+    EXTERNAL_API_SEND_PATH: bool = False  # Send the file path instead of the video to a local API
+    EXTERNAL_API_BINARY_UPLOAD: bool = False  # Send raw video bytes instead of base64 JSON
+    EXTERNAL_API_BATCH_URL: Optional[str] = None  # Optional: endpoint analyzing several videos per call
+    TRUST_INTERNAL_API: bool = True  # Skip validating responses from our own analyzer
     
     # PDF Report Configuration
     PDF_OUTPUT_PATH: str = "./reports"
     COMPANY_NAME: str = "Your Company Name"
     REPORT_LOGO_PATH: Optional[str] = None  # Optional: path to company logo
+    PDF_WORKERS: Optional[int] = None  # Report worker processes (default: CPU count)
     
     class Config:
         env_file = ".env"
@@ -1,7 +1,9 @@
 # app/controllers/video_controller.py
 from fastapi import HTTPException
+import httpx
 import logging
 from app.schemas.video_schema import AnalyzeRequest, AnalyzeResponse
+from app.services.pdf_service import PDFWorkerPool
 from app.services.video_service import VideoService
 
 logger = logging.getLogger(__name__)
@@ -10,7 +12,12 @@ class VideoController:
     def __init__(self):
         self.video_service = VideoService()
     
-    async def analyze_interview(self, request: AnalyzeRequest) -> AnalyzeResponse:
+    async def analyze_interview(
+        self,
+        request: AnalyzeRequest,
+        http_client: httpx.AsyncClient,
+        pdf_pool: PDFWorkerPool
+    ) -> AnalyzeResponse:
         """
         Controller method to handle interview analysis
         """
@@ -18,7 +25,9 @@ class VideoController:
             logger.info(f"Received analysis request for interview_id: {request.interview_id}")
             
             # Call service layer
-            result = self.video_service.analyze_videos(
+            result = await self.video_service.analyze_videos(
+                http_client=http_client,
+                pdf_pool=pdf_pool,
                 interview_id=request.interview_id,
                 num_videos=request.num_videos
             )
@@ -26,7 +35,8 @@ class VideoController:
             if result["status"] == "error":
                 raise HTTPException(status_code=404, detail=result["message"])
             
-            return AnalyzeResponse(**result)
+            # Built from our own service output, so skip re-validation
+            return AnalyzeResponse.model_construct(**result)
             
         except HTTPException:
             raise
@@ -1,7 +1,11 @@
 # app/main.py
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from app.routes import video_routes
 from app.config import settings
+from app.services.pdf_service import PDFWorkerPool
+import httpx
 import logging
 
 # Configure logging
@@ -10,10 +14,30 @@ logging.basicConfig(
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One shared client so calls to the external API reuse pooled connections.
+    # The transport retries failed connection attempts; gateway errors are
+    # retried by APIService
+    app.state.http_client = httpx.AsyncClient(
+        timeout=settings.EXTERNAL_API_TIMEOUT,
+        transport=httpx.AsyncHTTPTransport(
+            retries=settings.EXTERNAL_API_RETRIES,
+            limits=httpx.Limits(max_connections=32, max_keepalive_connections=16)
+        )
+    )
+    # Reports are built in worker processes to keep the event loop (and the GIL) free
+    app.state.pdf_pool = PDFWorkerPool(settings.PDF_WORKERS)
+    yield
+    await app.state.http_client.aclose()
+    app.state.pdf_pool.shutdown()
+
 app = FastAPI(
     title="Video Genuinity Analysis API",
     description="API for analyzing video genuinity scores and generating PDF reports",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 # Include routers
@@ -1,64 +1,73 @@
 # app/routes/video_routes.py
-from fastapi import APIRouter, Depends
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import FileResponse, Response
+import httpx
 from app.schemas.video_schema import AnalyzeRequest, AnalyzeResponse
 from app.controllers.video_controller import VideoController
+from app.services.pdf_service import PDFWorkerPool, find_latest_report
 import os
 
 router = APIRouter()
 
+# Shared across requests; the controller and its services hold no per-request state
+_controller = VideoController()
+
 def get_video_controller():
-    return VideoController()
+    return _controller
+
+def get_http_client(request: Request) -> httpx.AsyncClient:
+    return request.app.state.http_client
+
+def get_pdf_pool(request: Request) -> PDFWorkerPool:
+    return request.app.state.pdf_pool
 
 @router.post("/analyze", response_model=AnalyzeResponse)
 async def analyze_videos(
     request: AnalyzeRequest,
-    controller: VideoController = Depends(get_video_controller)
+    controller: VideoController = Depends(get_video_controller),
+    http_client: httpx.AsyncClient = Depends(get_http_client),
+    pdf_pool: PDFWorkerPool = Depends(get_pdf_pool)
 ):
     """
     Analyze videos for a given interview_id
     
     - **interview_id**: The ID of the interview to analyze
-    - **num_videos**: (Optional) Number of random videos to select. If not provided, uses config default
+    - **num_videos**: (Optional) Number of random videos to select, at least 1. If not provided, uses config default
     
     Returns analysis results including average genuinity score and PDF report path
     """
-    return await controller.analyze_interview(request)
+    result = await controller.analyze_interview(request, http_client, pdf_pool)
+    # Returning a Response skips FastAPI's re-validation against response_model,
+    # which is kept for the OpenAPI schema
+    return Response(content=result.model_dump_json(), media_type="application/json")
 
 @router.get("/test/{interview_id}")
-async def test_video_path(interview_id: str):
+def test_video_path(
+    interview_id: str,
+    controller: VideoController = Depends(get_video_controller)
+):
     """
     Test endpoint to check if videos exist for an interview_id
     """
-    from app.services.video_service import VideoService
-    service = VideoService()
-    videos = service.get_video_files(interview_id)
+    videos = controller.video_service.get_video_files(interview_id)
     
     return {
         "interview_id": interview_id,
         "videos_found": len(videos),
-        "video_paths": videos
+        "video_paths": [video_path for video_path, _ in videos]
     }
 
 @router.get("/download-report/{interview_id}")
-async def download_report(interview_id: str):
+def download_report(interview_id: str):
     """
     Download the PDF report for a specific interview
     """
-    from app.config import settings
-    import glob
+    latest_report = find_latest_report(interview_id)
     
-    # Find the latest report for this interview_id
-    pattern = os.path.join(settings.PDF_OUTPUT_PATH, f"{interview_id}_*.pdf")
-    reports = glob.glob(pattern)
-    
-    if not reports:
+    if not latest_report:
         from fastapi import HTTPException
         raise HTTPException(status_code=404, detail="Report not found")
     
-    # Get the most recent report
-    latest_report = max(reports, key=os.path.getctime)
-    
     return FileResponse(
         latest_report,
         media_type='application/pdf',
@@ -1,15 +1,19 @@
 # app/schemas/video_schema.py
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, Field
 from typing import List, Dict, Optional
 from datetime import datetime
 
 class DetailedError(BaseModel):
+    model_config = ConfigDict(frozen=True)
+    
     error_type: str
     from_time: float
     to_time: float
     confidence: float
 
 class VideoAnalysisResponse(BaseModel):
+    model_config = ConfigDict(frozen=True)
+    
     video_name: str
     total_duration: float
     genuinity_score: float
@@ -19,10 +23,14 @@ class VideoAnalysisResponse(BaseModel):
     analysis_timestamp: datetime
 
 class AnalyzeRequest(BaseModel):
+    model_config = ConfigDict(frozen=True)
+    
     interview_id: str
-    num_videos: Optional[int] = None
+    num_videos: Optional[int] = Field(default=None, ge=1)
 
 class AnalyzeResponse(BaseModel):
+    model_config = ConfigDict(frozen=True)
+    
     interview_id: str
     videos_analyzed: int
     average_genuinity_score: float
@@ -1,32 +1,234 @@
-import requests
+import os
+import base64
+import asyncio
+import httpx
+import orjson
 import logging
+from cachetools import TTLCache
 from datetime import datetime
+from typing import List, Optional, Tuple
+from urllib.parse import quote, urlparse
 from app.config import settings
 from app.schemas.video_schema import VideoAnalysisResponse, DetailedError
 
 logger = logging.getLogger(__name__)
 
+# Raw bytes read per chunk (1 MiB once encoded); a multiple of 3 so no
+# chunk needs base64 padding
+UPLOAD_CHUNK_SIZE = 3 * 256 * 1024
+
+# Gateway errors worth retrying, and the base delay doubled after each retry
+RETRY_STATUS_CODES = (502, 503, 504)
+RETRY_BACKOFF = 0.3  # seconds
+
+LOCAL_HOSTS = ('127.0.0.1', 'localhost', '::1')
+
+# Analyses kept in memory, so a repeated /analyze doesn't re-upload the same videos
+ANALYSIS_CACHE_SIZE = 1024
+ANALYSIS_CACHE_TTL = 3600  # seconds
+
+def _analysis_cache_key(video_path: str) -> Tuple[str, int, int]:
+    """
+    Identify a video by path, mtime and size, so a replaced file is re-analyzed.
+    The size also sets the upload's Content-Length, so a single stat serves both
+    """
+    stat = os.stat(video_path)
+    return video_path, stat.st_mtime_ns, stat.st_size
+
+def _read_chunk(video_file, buffer: bytearray, encode: bool) -> bytes:
+    size = video_file.readinto(buffer)
+    # Encode straight from the reused buffer, without copying the chunk first
+    with memoryview(buffer)[:size] as chunk:
+        return base64.b64encode(chunk) if encode else bytes(chunk)
+
+async def iter_video_chunks(video_path: str, encode: bool = False):
+    """Yield the video in chunks, base64-encoded if requested"""
+    # Disk reads and encoding run in a worker thread to keep the event loop free.
+    # Plain reads rather than mmap: a file truncated mid-upload only cuts this
+    # video short, where touching a truncated mapping would SIGBUS the process
+    video_file = await asyncio.to_thread(open, video_path, 'rb')
+    buffer = bytearray(UPLOAD_CHUNK_SIZE)
+    try:
+        while True:
+            chunk = await asyncio.to_thread(_read_chunk, video_file, buffer, encode)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        video_file.close()
+
+class VideoFilePayload:
+    """Streams the raw video bytes from disk, for analyzers that accept binary uploads"""
+    
+    def __init__(self, video_path: str, video_size: int):
+        self.video_path = video_path
+        self.video_size = video_size
+    
+    def __len__(self) -> int:
+        return self.video_size
+    
+    def __aiter__(self):
+        return iter_video_chunks(self.video_path)
+
+class VideoBlobPayload:
+    """
+    Streams the {"video_blob": "<base64>"} request body straight from disk,
+    so neither the raw video nor its base64 encoding is held in memory
+    """
+    PREFIX = b'{"video_blob": "'
+    SUFFIX = b'"}'
+    
+    def __init__(self, video_path: str, video_size: int):
+        self.video_path = video_path
+        self.video_size = video_size
+    
+    @property
+    def encoded_size(self) -> int:
+        return 4 * ((self.video_size + 2) // 3)
+    
+    def __len__(self) -> int:
+        # Known up front, so the request carries a Content-Length instead of chunking
+        return len(self.PREFIX) + self.encoded_size + len(self.SUFFIX)
+    
+    async def __aiter__(self):
+        yield self.PREFIX
+        async for chunk in iter_video_chunks(self.video_path, encode=True):
+            yield chunk
+        yield self.SUFFIX
+
+class VideoBatchPayload:
+    """
+    Streams {"videos": [{"video_name": "...", "video_blob": "<base64>"}, ...]}
+    for the batch endpoint, one video after the other
+    """
+    PREFIX = b'{"videos": ['
+    SEPARATOR = b', '
+    SUFFIX = b']}'
+    
+    def __init__(self, videos: List[Tuple[str, str]], video_sizes: List[int]):
+        self.items = [
+            (b'{"video_name": ' + orjson.dumps(video_name) + b', "video_blob": "', VideoBlobPayload(video_path, video_size))
+            for (video_path, video_name), video_size in zip(videos, video_sizes)
+        ]
+    
+    def __len__(self) -> int:
+        items_size = sum(
+            len(head) + blob.encoded_size + len(VideoBlobPayload.SUFFIX)
+            for head, blob in self.items
+        )
+        separators_size = len(self.SEPARATOR) * max(len(self.items) - 1, 0)
+        return len(self.PREFIX) + items_size + separators_size + len(self.SUFFIX)
+    
+    async def __aiter__(self):
+        yield self.PREFIX
+        for idx, (head, blob) in enumerate(self.items):
+            if idx:
+                yield self.SEPARATOR
+            yield head
+            async for chunk in iter_video_chunks(blob.video_path, encode=True):
+                yield chunk
+            yield VideoBlobPayload.SUFFIX
+        yield self.SUFFIX
+
 class APIService:
-    def analyze_video(self, video_base64: str, video_name: str) -> VideoAnalysisResponse:
+    def __init__(self):
+        # A co-located analyzer can read the file itself; nothing is uploaded
+        self.send_video_path = (
+            settings.EXTERNAL_API_SEND_PATH
+            and urlparse(settings.EXTERNAL_API_URL).hostname in LOCAL_HOSTS
+        )
+        # The batch body carries the videos themselves, so path references win over it.
+        # Cleared once the analyzer rejects the batch endpoint, so it isn't retried
+        self.batch_supported = bool(settings.EXTERNAL_API_BATCH_URL) and not self.send_video_path
+        # (video_path, st_mtime_ns, st_size) -> VideoAnalysisResponse
+        self.analysis_cache = TTLCache(maxsize=ANALYSIS_CACHE_SIZE, ttl=ANALYSIS_CACHE_TTL)
+    
+    async def _post(
+        self,
+        http_client: httpx.AsyncClient,
+        url: str,
+        payload,
+        headers: dict
+    ) -> httpx.Response:
+        """POST to the analyzer, retrying gateway errors with exponential backoff"""
+        retries = settings.EXTERNAL_API_RETRIES
+        for attempt in range(retries + 1):
+            # Payloads re-read the video from disk on every iteration, so they can be re-sent
+            response = await http_client.post(url, content=payload, headers=headers)
+            if response.status_code not in RETRY_STATUS_CODES or attempt == retries:
+                return response
+            
+            delay = RETRY_BACKOFF * (2 ** attempt)
+            logger.warning(f"API returned HTTP {response.status_code}, retrying in {delay:.1f}s ({attempt + 1}/{retries})")
+            await asyncio.sleep(delay)
+    
+    def _parse_analysis(self, data: dict, video_name: str) -> VideoAnalysisResponse:
+        """Build our schema from the analysis data of one video"""
+        # Log the scores
+        logger.info(f"Video: {video_name} | Score: {data.get('genuinity_score')} | Duration: {data.get('total_duration')} | Penalty: {data.get('total_penalty')}")
+        
+        timestamp = data.get("analysis_timestamp")
+        analysis_timestamp = datetime.fromisoformat(timestamp) if timestamp else datetime.now()
+        
+        # Output of the trusted internal analyzer is not re-validated
+        if settings.TRUST_INTERNAL_API:
+            build_error = DetailedError.model_construct
+            build_analysis = VideoAnalysisResponse.model_construct
+        else:
+            build_error = DetailedError
+            build_analysis = VideoAnalysisResponse
+        
+        return build_analysis(
+            video_name=video_name,
+            total_duration=float(data.get("total_duration", 0.0)),
+            genuinity_score=float(data.get("genuinity_score", 0.0)),
+            total_penalty=float(data.get("total_penalty", 0.0)),
+            errors_summary=data.get("errors_summary", {}),
+            detailed_errors=[
+                build_error(**error) for error in data.get("detailed_errors", [])
+            ],
+            analysis_timestamp=analysis_timestamp
+        )
+    
+    async def analyze_video(
+        self,
+        http_client: httpx.AsyncClient,
+        video_path: str,
+        video_name: str
+    ) -> VideoAnalysisResponse:
         """
         Analyze video using external API
         """
-        logger.info(f"Calling API for video: {video_name}")
-        
+        response_json = None
         try:
-            payload = {
-                "video_blob": video_base64
-            }
+            # Stat in a worker thread; on network storage it can stall the event loop
+            cache_key = await asyncio.to_thread(_analysis_cache_key, video_path)
+            cached = self.analysis_cache.get(cache_key)
+            if cached is not None:
+                logger.info(f"Using cached analysis for video: {video_name}")
+                return cached
             
-            response = requests.post(
-                settings.EXTERNAL_API_URL,
-                json=payload,
-                timeout=settings.EXTERNAL_API_TIMEOUT
-            )
+            logger.info(f"Calling API for video: {video_name}")
+            
+            if self.send_video_path:
+                payload = orjson.dumps({"video_path": os.path.abspath(video_path)})
+                headers = {"Content-Type": "application/json"}
+            elif settings.EXTERNAL_API_BINARY_UPLOAD:
+                payload = VideoFilePayload(video_path, cache_key[2])
+                headers = {
+                    "Content-Type": "application/octet-stream",
+                    "X-Video-Name": quote(video_name)
+                }
+            else:
+                payload = VideoBlobPayload(video_path, cache_key[2])
+                headers = {"Content-Type": "application/json"}
+            headers["Content-Length"] = str(len(payload))
+            
+            response = await self._post(http_client, settings.EXTERNAL_API_URL, payload, headers)
             
             response.raise_for_status()
             
-            response_json = response.json()
+            response_json = orjson.loads(response.content)
             
             # Log the response status
             logger.info(f"API Response Status: {response_json.get('status')} - {response_json.get('message')}")
@@ -38,25 +240,12 @@ class APIService:
                 logger.error(f"No data in API response for {video_name}")
                 raise ValueError("API response missing 'data' field")
             
-            # Log the scores
-            logger.info(f"Video: {video_name} | Score: {data.get('genuinity_score')} | Duration: {data.get('total_duration')} | Penalty: {data.get('total_penalty')}")
-            
             # Parse the response into our schema
-            return VideoAnalysisResponse(
-                video_name=video_name,
-                total_duration=float(data.get("total_duration", 0.0)),
-                genuinity_score=float(data.get("genuinity_score", 0.0)),
-                total_penalty=float(data.get("total_penalty", 0.0)),
-                errors_summary=data.get("errors_summary", {}),
-                detailed_errors=[
-                    DetailedError(**error) for error in data.get("detailed_errors", [])
-                ],
-                analysis_timestamp=datetime.fromisoformat(
-                    data.get("analysis_timestamp", datetime.now().isoformat())
-                )
-            )
+            analysis = self._parse_analysis(data, video_name)
+            self.analysis_cache[cache_key] = analysis
+            return analysis
             
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             logger.error(f"API call failed for {video_name}: {e}")
             raise
         except (KeyError, ValueError) as e:
@@ -65,4 +254,61 @@ class APIService:
             raise
         except Exception as e:
             logger.error(f"Unexpected error for {video_name}: {e}")
-            raise
\ No newline at end of file
+            raise
+    
+    async def analyze_videos_batch(
+        self,
+        http_client: httpx.AsyncClient,
+        videos: List[Tuple[str, str]]
+    ) -> Optional[List[VideoAnalysisResponse]]:
+        """
+        Analyze several (video_path, video_name) pairs with a single call to the
+        batch endpoint. Returns None if the analyzer doesn't support batches
+        """
+        cache_keys = await asyncio.gather(
+            *(asyncio.to_thread(_analysis_cache_key, video_path) for video_path, _ in videos)
+        )
+        analyses = [self.analysis_cache.get(cache_key) for cache_key in cache_keys]
+        # Indexes of the videos that still need to be analyzed
+        pending = [idx for idx, analysis in enumerate(analyses) if analysis is None]
+        if not pending:
+            logger.info(f"Using cached analyses for all {len(videos)} videos")
+            return analyses
+        
+        logger.info(f"Calling batch API for {len(pending)} videos ({len(videos) - len(pending)} cached)")
+        
+        payload = VideoBatchPayload(
+            [videos[idx] for idx in pending],
+            [cache_keys[idx][2] for idx in pending]
+        )
+        response = await self._post(
+            http_client,
+            settings.EXTERNAL_API_BATCH_URL,
+            payload,
+            {
+                "Content-Type": "application/json",
+                "Content-Length": str(len(payload))
+            }
+        )
+        
+        if response.status_code in (404, 415):
+            logger.warning(f"Batch endpoint not supported (HTTP {response.status_code}), analyzing videos one by one")
+            self.batch_supported = False
+            return None
+        
+        response.raise_for_status()
+        
+        response_json = orjson.loads(response.content)
+        logger.info(f"API Response Status: {response_json.get('status')} - {response_json.get('message')}")
+        
+        # One analysis per video sent, in request order
+        data = response_json.get("data") or []
+        if len(data) != len(pending):
+            raise ValueError(f"Batch API returned {len(data)} analyses for {len(pending)} videos")
+        
+        for idx, video_data in zip(pending, data):
+            analysis = self._parse_analysis(video_data, videos[idx][1])
+            self.analysis_cache[cache_keys[idx]] = analysis
+            analyses[idx] = analysis
+        
+        return analyses
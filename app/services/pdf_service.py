@@ -1,7 +1,12 @@
 # app/services/pdf_service.py
 import os
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
-from typing import List, Dict
+from functools import lru_cache
+from typing import Callable, List, Dict, Optional
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import letter, A4
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
@@ -14,32 +19,175 @@ import logging
 
 logger = logging.getLogger(__name__)
 
-class PDFService:
-    def __init__(self):
-        # Create reports directory if it doesn't exist
-        os.makedirs(settings.PDF_OUTPUT_PATH, exist_ok=True)
-        
-        # Define custom styles
-        self.styles = getSampleStyleSheet()
-        self.title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=self.styles['Heading1'],
-            fontSize=24,
-            textColor=colors.HexColor('#1a1a1a'),
-            spaceAfter=30,
-            alignment=TA_CENTER,
-            fontName='Helvetica-Bold'
-        )
-        self.heading_style = ParagraphStyle(
-            'CustomHeading',
-            parent=self.styles['Heading2'],
-            fontSize=16,
-            textColor=colors.HexColor('#2c3e50'),
-            spaceAfter=12,
-            spaceBefore=12,
-            fontName='Helvetica-Bold'
+@lru_cache(maxsize=64)
+def _display_name(error_type: str) -> str:
+    """'looking_away' -> 'Looking Away'; error types repeat across rows and reports"""
+    return error_type.replace('_', ' ').title()
+
+# Latest report generated through this process, per interview_id; the oldest
+# entry is dropped beyond REPORT_INDEX_SIZE (its report is then found by a scan)
+REPORT_INDEX_SIZE = 1024
+_latest_reports: Dict[str, str] = {}
+
+def register_report(interview_id: str, report_path: str) -> None:
+    """Record a newly generated report so find_latest_report can usually skip the scan"""
+    # Re-inserted, so entries stay in registration order
+    _latest_reports.pop(interview_id, None)
+    if len(_latest_reports) >= REPORT_INDEX_SIZE:
+        _latest_reports.pop(next(iter(_latest_reports)))
+    _latest_reports[interview_id] = report_path
+
+def find_latest_report(interview_id: str) -> Optional[str]:
+    """Return the path of the most recent PDF report for an interview, if any"""
+    report_path = _latest_reports.get(interview_id)
+    if report_path:
+        try:
+            # Creating or deleting a report bumps the folder mtime, so if it is no later
+            # than our report, no other worker process has written a report since
+            if os.stat(settings.PDF_OUTPUT_PATH).st_mtime_ns <= os.stat(report_path).st_ctime_ns:
+                return report_path
+        except FileNotFoundError:
+            pass
+    
+    # Not generated by this process, or the folder changed since: single pass
+    # over the reports folder, one stat per matching report
+    prefix = f"{interview_id}_"
+    latest_report, latest_ctime = None, -1.0
+    try:
+        with os.scandir(settings.PDF_OUTPUT_PATH) as entries:
+            for entry in entries:
+                if entry.name.startswith(prefix) and entry.name.endswith(".pdf"):
+                    ctime = entry.stat().st_ctime
+                    if ctime > latest_ctime:
+                        latest_report, latest_ctime = entry.path, ctime
+    except FileNotFoundError:
+        return None
+    
+    return latest_report
+
+class PDFWorkerPool:
+    """
+    Worker processes that build PDF reports. ReportLab layout is CPU-bound pure
+    Python, so it runs outside the event loop (and the GIL)
+    """
+    
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers
+        self.executor = self._create_executor()
+    
+    def _create_executor(self) -> ProcessPoolExecutor:
+        # "spawn" avoids forking a process that is running an event loop and worker threads
+        return ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context("spawn")
         )
-        self.normal_style = self.styles['Normal']
+    
+    async def run(self, fn: Callable, *args):
+        """Run fn(*args) in a worker process, retrying once on a fresh pool if a worker died"""
+        loop = asyncio.get_running_loop()
+        executor = self.executor
+        try:
+            return await loop.run_in_executor(executor, fn, *args)
+        except BrokenProcessPool:
+            # A dead worker (OOM kill, crash in ReportLab) breaks the pool for good.
+            # Concurrent reports fail on the same pool; only the first replaces it
+            if self.executor is executor:
+                logger.error("A PDF worker process died, replacing the PDF worker pool")
+                executor.shutdown(wait=False)
+                self.executor = self._create_executor()
+            return await loop.run_in_executor(self.executor, fn, *args)
+    
+    def shutdown(self) -> None:
+        self.executor.shutdown()
+
+# Create reports directory if it doesn't exist
+os.makedirs(settings.PDF_OUTPUT_PATH, exist_ok=True)
+
+class PDFService:
+    # Custom styles, built once and shared by every report
+    styles = getSampleStyleSheet()
+    title_style = ParagraphStyle(
+        'CustomTitle',
+        parent=styles['Heading1'],
+        fontSize=24,
+        textColor=colors.HexColor('#1a1a1a'),
+        spaceAfter=30,
+        alignment=TA_CENTER,
+        fontName='Helvetica-Bold'
+    )
+    heading_style = ParagraphStyle(
+        'CustomHeading',
+        parent=styles['Heading2'],
+        fontSize=16,
+        textColor=colors.HexColor('#2c3e50'),
+        spaceAfter=12,
+        spaceBefore=12,
+        fontName='Helvetica-Bold'
+    )
+    normal_style = styles['Normal']
+    video_heading_style = ParagraphStyle(
+        'VideoHeading',
+        parent=normal_style,
+        fontSize=13,
+        textColor=colors.HexColor('#2c3e50'),
+        fontName='Helvetica-Bold',
+        spaceAfter=8
+    )
+    good_news_style = ParagraphStyle('GoodNews', parent=normal_style, textColor=colors.green, fontSize=12)
+    footer_style = ParagraphStyle(
+        'Footer',
+        parent=normal_style,
+        fontSize=9,
+        textColor=colors.grey,
+        alignment=TA_CENTER
+    )
+    
+    # Assessment line for each score band, best first
+    summary_excellent_style = ParagraphStyle(
+        'SummaryExcellent', parent=normal_style, fontSize=12, textColor=colors.green, spaceAfter=10
+    )
+    summary_good_style = ParagraphStyle(
+        'SummaryGood', parent=normal_style, fontSize=12, textColor=colors.orange, spaceAfter=10
+    )
+    summary_poor_style = ParagraphStyle(
+        'SummaryPoor', parent=normal_style, fontSize=12, textColor=colors.red, spaceAfter=10
+    )
+    
+    header_table_style = TableStyle([
+        ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#ecf0f1')),
+        ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
+        ('ALIGN', (0, 0), (0, -1), 'RIGHT'),
+        ('ALIGN', (1, 0), (1, -1), 'LEFT'),
+        ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+        ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
+        ('FONTSIZE', (0, 0), (-1, -1), 11),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+        ('TOPPADDING', (0, 0), (-1, -1), 8),
+        ('GRID', (0, 0), (-1, -1), 1, colors.grey)
+    ])
+    video_table_style = TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#3498db')),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 11),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black),
+        ('FONTSIZE', (0, 1), (-1, -1), 9),
+        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey])
+    ])
+    error_table_style = TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#e74c3c')),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 10),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 10),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.lightpink),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black),
+        ('FONTSIZE', (0, 1), (-1, -1), 8)
+    ])
     
     def generate_report(
         self,
@@ -50,7 +198,9 @@ class PDFService:
     ) -> str:
         """Generate comprehensive PDF report"""
         
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        # One clock read, so file name, header and footer agree
+        now = datetime.now()
+        timestamp = now.strftime("%Y%m%d_%H%M%S")
         filename = f"{interview_id}_{timestamp}.pdf"
         filepath = os.path.join(settings.PDF_OUTPUT_PATH, filename)
         
@@ -77,24 +227,13 @@ class PDFService:
         # Add header information
         header_data = [
             ["Interview ID:", interview_id],
-            ["Report Date:", datetime.now().strftime("%Y-%m-%d %H:%M:%S")],
+            ["Report Date:", now.strftime("%Y-%m-%d %H:%M:%S")],
             ["Videos Analyzed:", str(len(individual_results))],
             ["Average Genuinity Score:", f"{average_score:.2f}/10"]
         ]
         
         header_table = Table(header_data, colWidths=[2.5*inch, 3.5*inch])
-        header_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#ecf0f1')),
-            ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
-            ('ALIGN', (0, 0), (0, -1), 'RIGHT'),
-            ('ALIGN', (1, 0), (1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-            ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 0), (-1, -1), 11),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-            ('TOPPADDING', (0, 0), (-1, -1), 8),
-            ('GRID', (0, 0), (-1, -1), 1, colors.grey)
-        ]))
+        header_table.setStyle(self.header_table_style)
         elements.append(header_table)
         elements.append(Spacer(1, 0.3*inch))
         
@@ -104,21 +243,14 @@ class PDFService:
         # Score interpretation
         if average_score >= 8:
             score_text = "Excellent - High genuinity detected"
-            score_color = colors.green
+            summary_style = self.summary_excellent_style
         elif average_score >= 6:
             score_text = "Good - Acceptable genuinity level"
-            score_color = colors.orange
+            summary_style = self.summary_good_style
         else:
             score_text = "Poor - Multiple violations detected"
-            score_color = colors.red
+            summary_style = self.summary_poor_style
         
-        summary_style = ParagraphStyle(
-            'Summary',
-            parent=self.normal_style,
-            fontSize=12,
-            textColor=score_color,
-            spaceAfter=10
-        )
         elements.append(Paragraph(f"<b>Assessment:</b> {score_text}", summary_style))
         elements.append(Spacer(1, 0.2*inch))
         
@@ -136,18 +268,7 @@ class PDFService:
             ])
         
         video_table = Table(video_data, colWidths=[0.5*inch, 2.5*inch, 1*inch, 1*inch, 1*inch])
-        video_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#3498db')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 11),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            ('FONTSIZE', (0, 1), (-1, -1), 9),
-            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey])
-        ]))
+        video_table.setStyle(self.video_table_style)
         elements.append(video_table)
         elements.append(Spacer(1, 0.3*inch))
         
@@ -166,87 +287,60 @@ class PDFService:
             ))
             elements.append(Spacer(1, 0.2*inch))
             
+            normal_style = self.normal_style
             for analysis in videos_with_errors:
                 # Video name header
-                video_heading = ParagraphStyle(
-                    'VideoHeading',
-                    parent=self.normal_style,
-                    fontSize=13,
-                    textColor=colors.HexColor('#2c3e50'),
-                    fontName='Helvetica-Bold',
-                    spaceAfter=8
-                )
-                elements.append(Paragraph(f"Video: {analysis.video_name}", video_heading))
+                elements.append(Paragraph(f"Video: {analysis.video_name}", self.video_heading_style))
                 elements.append(Paragraph(
                     f"Score: {analysis.genuinity_score:.2f}/10 | "
                     f"Duration: {analysis.total_duration:.1f}s | "
                     f"Total Penalty: {analysis.total_penalty:.2f}",
-                    self.normal_style
+                    normal_style
                 ))
                 elements.append(Spacer(1, 0.1*inch))
                 
                 # Errors table
                 if analysis.detailed_errors:
                     error_data = [["Error Type", "From (s)", "To (s)", "Duration (s)", "Confidence"]]
-                    for error in analysis.detailed_errors:
-                        duration = error.to_time - error.from_time
-                        error_data.append([
-                            error.error_type.replace('_', ' ').title(),
+                    error_data += [
+                        (
+                            _display_name(error.error_type),
                             f"{error.from_time:.1f}",
                             f"{error.to_time:.1f}",
-                            f"{duration:.1f}",
+                            f"{error.to_time - error.from_time:.1f}",
                             f"{error.confidence:.2f}"
-                        ])
+                        )
+                        for error in analysis.detailed_errors
+                    ]
                     
                     error_table = Table(error_data, colWidths=[2*inch, 0.8*inch, 0.8*inch, 1*inch, 1*inch])
-                    error_table.setStyle(TableStyle([
-                        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#e74c3c')),
-                        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                        ('FONTSIZE', (0, 0), (-1, 0), 10),
-                        ('BOTTOMPADDING', (0, 0), (-1, 0), 10),
-                        ('BACKGROUND', (0, 1), (-1, -1), colors.lightpink),
-                        ('GRID', (0, 0), (-1, -1), 1, colors.black),
-                        ('FONTSIZE', (0, 1), (-1, -1), 8)
-                    ]))
+                    error_table.setStyle(self.error_table_style)
                     elements.append(error_table)
                 
                 # Error summary
                 if analysis.errors_summary:
                     elements.append(Spacer(1, 0.15*inch))
-                    elements.append(Paragraph("<b>Error Summary:</b>", self.normal_style))
+                    elements.append(Paragraph("<b>Error Summary:</b>", normal_style))
                     
                     for error_type, summary in analysis.errors_summary.items():
                         if summary:
-                            summary_text = f"• {error_type.replace('_', ' ').title()}: "
-                            details = []
-                            for key, value in summary.items():
-                                details.append(f"{key}={value:.2f}")
-                            summary_text += ", ".join(details)
-                            elements.append(Paragraph(summary_text, self.normal_style))
+                            details = ", ".join(f"{key}={value:.2f}" for key, value in summary.items())
+                            elements.append(Paragraph(f"• {_display_name(error_type)}: {details}", normal_style))
                 
                 elements.append(Spacer(1, 0.3*inch))
         else:
             elements.append(Paragraph(
                 "<b>No violations detected in any video!</b>",
-                ParagraphStyle('GoodNews', parent=self.normal_style, textColor=colors.green, fontSize=12)
+                self.good_news_style
             ))
         
         # Add footer
         elements.append(PageBreak())
         elements.append(Spacer(1, 0.5*inch))
-        footer_style = ParagraphStyle(
-            'Footer',
-            parent=self.normal_style,
-            fontSize=9,
-            textColor=colors.grey,
-            alignment=TA_CENTER
-        )
         elements.append(Paragraph(
             f"Report generated by {settings.COMPANY_NAME}<br/>"
-            f"Generated on {datetime.now().strftime('%Y-%m-%d at %H:%M:%S')}",
-            footer_style
+            f"Generated on {now.strftime('%Y-%m-%d at %H:%M:%S')}",
+            self.footer_style
         ))
         
         # Build PDF
@@ -1,129 +1,188 @@
 # app/services/video_service.py
 import os
-import base64
 import random
+import asyncio
 import logging
-from typing import List, Dict
+import threading
+import httpx
+from concurrent.futures.process import BrokenProcessPool
+from statistics import fmean
+from typing import Iterator, List, Dict, Optional, Tuple
 from pathlib import Path
 from datetime import datetime
 from app.config import settings
 from app.schemas.video_schema import VideoAnalysisResponse
 from app.services.api_service import APIService
-from app.services.pdf_service import PDFService
+from app.services.pdf_service import PDFService, PDFWorkerPool, register_report
 
 logger = logging.getLogger(__name__)
 
+# Supported video formats (a tuple so str.endswith checks them in one call)
+VIDEO_EXTENSIONS = ('.mp4', '.avi', '.mov', '.mkv', '.flv', '.wmv')
+
+# Interview folder listings kept in memory; the oldest is dropped beyond this
+VIDEO_LIST_CACHE_SIZE = 1024
+
+def _iter_video_files(video_folder: str) -> Iterator[Tuple[str, str]]:
+    """Yield (path, name) for each video file in a folder"""
+    # DirEntry.is_file() is answered from the directory listing, without a stat per file
+    with os.scandir(video_folder) as entries:
+        for entry in entries:
+            if entry.is_file() and entry.name.lower().endswith(VIDEO_EXTENSIONS):
+                yield entry.path, entry.name
+
 class VideoService:
     def __init__(self):
         self.api_service = APIService()
         self.pdf_service = PDFService()
+        # Caps concurrent uploads across all requests handled by this process
+        self.upload_semaphore = asyncio.Semaphore(settings.MAX_CONCURRENT_UPLOADS)
+        # interview_id -> (folder st_mtime_ns, video files). Adding, removing or
+        # renaming a file changes the folder mtime, so a single stat tells whether
+        # a listing is still valid. Scans run in threads, hence the lock
+        self._video_list_cache: Dict[str, Tuple[int, List[Tuple[str, str]]]] = {}
+        self._video_list_cache_lock = threading.Lock()
     
-    def get_video_files(self, interview_id: str) -> List[str]:
-        """Get all video files for a given interview_id"""
+    def _get_cached_video_files(self, interview_id: str, folder_mtime: int) -> Optional[List[Tuple[str, str]]]:
+        """Return the cached listing if the folder hasn't changed since it was taken"""
+        with self._video_list_cache_lock:
+            cached = self._video_list_cache.get(interview_id)
+        if cached and cached[0] == folder_mtime:
+            return cached[1]
+        return None
+    
+    def get_video_files(self, interview_id: str) -> List[Tuple[str, str]]:
+        """Get (path, name) of all video files for a given interview_id"""
         video_folder = Path(settings.VIDEO_BASE_PATH) / interview_id
         
-        if not video_folder.exists():
+        try:
+            # Stat before scanning: a change during the scan leaves a stale mtime behind,
+            # which forces a rescan next time
+            folder_mtime = os.stat(video_folder).st_mtime_ns
+            video_files = self._get_cached_video_files(interview_id, folder_mtime)
+            if video_files is None:
+                video_files = list(_iter_video_files(str(video_folder)))
+                with self._video_list_cache_lock:
+                    if len(self._video_list_cache) >= VIDEO_LIST_CACHE_SIZE:
+                        self._video_list_cache.pop(next(iter(self._video_list_cache)))
+                    self._video_list_cache[interview_id] = (folder_mtime, video_files)
+        except (FileNotFoundError, NotADirectoryError):
             logger.warning(f"Video folder not found: {video_folder}")
             return []
         
-        # Supported video formats
-        video_extensions = ['.mp4', '.avi', '.mov', '.mkv', '.flv', '.wmv']
-        
-        video_files = []
-        for file in video_folder.iterdir():
-            if file.is_file() and file.suffix.lower() in video_extensions:
-                video_files.append(str(file))
-        
         logger.info(f"Found {len(video_files)} video files for interview_id: {interview_id}")
-        return video_files
+        # Copy, so callers can't modify the cached listing
+        return list(video_files)
     
-    def select_random_videos(self, video_files: List[str], num_videos: int = None) -> List[str]:
-        """Randomly select n videos from the list"""
+    def select_random_videos(self, interview_id: str, num_videos: int = None) -> List[Tuple[str, str]]:
+        """Randomly select (path, name) of n videos for a given interview_id (all of them if there are fewer)"""
         if num_videos is None:
             num_videos = settings.NUM_RANDOM_VIDEOS
         
-        # If we have fewer videos than requested, return all
-        if len(video_files) <= num_videos:
-            logger.info(f"Selecting all {len(video_files)} videos (requested: {num_videos})")
-            return video_files
+        # Served from the cached listing while the folder is unchanged, so repeated
+        # /analyze calls for an interview scan its folder only once
+        video_files = self.get_video_files(interview_id)
+        selected = random.sample(video_files, min(num_videos, len(video_files)))
         
-        selected = random.sample(video_files, num_videos)
-        logger.info(f"Randomly selected {len(selected)} videos from {len(video_files)} total")
+        logger.info(f"Randomly selected {len(selected)} videos from {len(video_files)} total (requested: {num_videos})")
         return selected
     
-    def video_to_base64(self, video_path: str) -> str:
-        """Convert video file to base64 encoded string"""
-        try:
-            with open(video_path, 'rb') as video_file:
-                video_data = video_file.read()
-                base64_data = base64.b64encode(video_data).decode('utf-8')
-            logger.info(f"Successfully encoded video: {video_path}")
-            return base64_data
-        except Exception as e:
-            logger.error(f"Error encoding video {video_path}: {e}")
-            raise
+    async def _analyze_one(
+        self,
+        http_client: httpx.AsyncClient,
+        video_path: str,
+        video_name: str
+    ) -> VideoAnalysisResponse:
+        """Analyze a single video with the external API"""
+        async with self.upload_semaphore:
+            logger.info(f"Processing video: {video_name}")
+            return await self.api_service.analyze_video(http_client, video_path, video_name)
+    
+    async def _analyze_batch(
+        self,
+        http_client: httpx.AsyncClient,
+        videos: List[Tuple[str, str]]
+    ) -> Optional[List[VideoAnalysisResponse]]:
+        """Analyze several videos with one call to the batch endpoint"""
+        # A batch streams its videos one after the other, so it takes a single upload slot
+        async with self.upload_semaphore:
+            return await self.api_service.analyze_videos_batch(http_client, videos)
     
-    def analyze_videos(self, interview_id: str, num_videos: int = None) -> Dict:
+    async def analyze_videos(
+        self,
+        http_client: httpx.AsyncClient,
+        pdf_pool: PDFWorkerPool,
+        interview_id: str,
+        num_videos: int = None
+    ) -> Dict:
         """Main method to analyze videos for an interview"""
-        # Get all video files
-        video_files = self.get_video_files(interview_id)
+        # Select random videos (directory scan runs off the event loop)
+        selected_videos = await asyncio.to_thread(self.select_random_videos, interview_id, num_videos)
         
-        if not video_files:
+        if not selected_videos:
             return {
                 "status": "error",
                 "message": f"No videos found for interview_id: {interview_id}"
             }
         
-        # Select random videos
-        selected_videos = self.select_random_videos(video_files, num_videos)
+        results = None
+        if len(selected_videos) > 1 and self.api_service.batch_supported:
+            try:
+                results = await self._analyze_batch(http_client, selected_videos)
+            except Exception as e:
+                logger.error(f"Batch analysis failed, analyzing videos one by one: {e}")
+        
+        if results is None:
+            # Analyze all videos concurrently; a failed video doesn't cancel the others
+            results = await asyncio.gather(
+                *(self._analyze_one(http_client, video_path, video_name) for video_path, video_name in selected_videos),
+                return_exceptions=True
+            )
         
-        # Analyze each video
-        analysis_results = []
         detailed_analyses = []
         
-        for video_path in selected_videos:
-            try:
-                video_name = os.path.basename(video_path)
-                logger.info(f"Processing video: {video_name}")
-                
-                # Convert to base64
-                video_base64 = self.video_to_base64(video_path)
-                
-                # Call API
-                analysis = self.api_service.analyze_video(video_base64, video_name)
-                
-                # Store both summary and detailed analysis
-                analysis_results.append({
-                    "video_name": video_name,
-                    "genuinity_score": analysis.genuinity_score,
-                    "total_duration": analysis.total_duration,
-                    "total_penalty": analysis.total_penalty
-                })
-                
-                detailed_analyses.append(analysis)
-                
-            except Exception as e:
-                logger.error(f"Error processing video {video_path}: {e}")
+        for (video_path, _), analysis in zip(selected_videos, results):
+            if isinstance(analysis, BaseException):
+                logger.error(f"Error processing video {video_path}: {analysis}")
                 continue
+            
+            detailed_analyses.append(analysis)
         
-        if not analysis_results:
+        if not detailed_analyses:
             return {
                 "status": "error",
                 "message": "Failed to analyze any videos"
             }
         
+        # Summary of each analysis, for the response and the report's score table
+        analysis_results = [
+            {
+                "video_name": analysis.video_name,
+                "genuinity_score": analysis.genuinity_score,
+                "total_duration": analysis.total_duration,
+                "total_penalty": analysis.total_penalty
+            }
+            for analysis in detailed_analyses
+        ]
+        
         # Calculate average genuinity score
-        avg_score = sum(r["genuinity_score"] for r in analysis_results) / len(analysis_results)
+        avg_score = fmean(analysis.genuinity_score for analysis in detailed_analyses)
         
         # Generate PDF report
         try:
-            pdf_path = self.pdf_service.generate_report(
-                interview_id=interview_id,
-                average_score=avg_score,
-                individual_results=analysis_results,
-                detailed_analyses=detailed_analyses
+            # Built in the worker pool; ReportLab layout would otherwise block the event loop
+            pdf_path = await pdf_pool.run(
+                self.pdf_service.generate_report,
+                interview_id,
+                avg_score,
+                analysis_results,
+                detailed_analyses
             )
+            register_report(interview_id, pdf_path)
             logger.info(f"PDF report generated: {pdf_path}")
+        except BrokenProcessPool as e:
+            logger.error(f"PDF worker process died building the report for {interview_id}, even on a fresh pool: {e}")
+            pdf_path = None
         except Exception as e:
             logger.error(f"Failed to generate PDF report: {e}")
             pdf_path = None